@@ -17,17 +17,63 @@ LOGGER.addHandler(_handler)
 
 
 class VideoCaptureThread(object):
-    def __init__(self, source=0, width=None, height=None, queue_size=10):
+    def __init__(self, source=0, width=None, height=None, queue_size=10, skip_factor=1, threads=None, hold_frames=1):
         self.source = source
-        self.video = cv.VideoCapture(self.source)
+        self.video = self.open(self.source, threads)
         if width:
             self.video.set(cv.CAP_PROP_FRAME_WIDTH, width)
         if height:
             self.video.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        # track position locally rather than querying the capture for each frame
+        self.frame_fps = self.video.get(cv.CAP_PROP_FPS)
+        self.frame_index = 0
+        self.frame_count = int(self.video.get(cv.CAP_PROP_FRAME_COUNT))
+        # only frames at multiples of the skip factor (and the last one) are decoded, others are simply grabbed
+        self.skip_factor = max(int(skip_factor), 1)
+        # forward seeks up to that many frames are done by grabbing frames rather than repositioning the stream
+        self.seek_grab_limit = int(self.frame_fps)
         self.started = False
         self.thread = None
+        self.wait_timeout = 0.1  # seconds
         self.queue = queue.Queue(maxsize=queue_size)
-        self.read_lock = threading.Lock()
+        # pool of frame buffers reused by the capture to avoid allocating a new one for each frame
+        # enough of them to fill the queue, plus the one being captured and the last ones read by the consumer
+        # consumer must copy any frame it needs to keep for longer than its 'hold_frames' most recent reads
+        # buffers are released on seek since the capture then refills the queue without waiting for consumer reads
+        self.frames = [None] * (queue_size + max(int(hold_frames), 1) + 2)
+        self.frame_slot = 0
+
+    @staticmethod
+    def open(source, threads=None):
+        """
+        Opens the video capture with hardware accelerated decoding if supported, or the default capture otherwise.
+
+        Software decoding by the FFmpeg backend is multi-threaded, using as many threads as available CPUs by default.
+        Note that frame-based threading adds latency of a few frames on decoding start, which does not matter for
+        the buffered playback of video files. For live devices, the driver-side buffer is reduced to a single frame.
+        """
+        if isinstance(source, str):
+            try:
+                params = [cv.CAP_PROP_HW_ACCELERATION, cv.VIDEO_ACCELERATION_ANY]
+                prop_threads = getattr(cv, "CAP_PROP_N_THREADS", None)  # OpenCV>=4.6
+                if prop_threads is not None:
+                    params.extend([prop_threads, threads or os.cpu_count() or 1])
+                video = cv.VideoCapture(source, cv.CAP_FFMPEG, params)
+                if video.isOpened():
+                    video_threads = video.get(prop_threads) if prop_threads is not None else "default"
+                    LOGGER.debug("Opened video capture with FFmpeg backend (hardware acceleration: %s, threads: %s).",
+                                 video.get(cv.CAP_PROP_HW_ACCELERATION), video_threads)
+                    return video
+            except (AttributeError, TypeError, cv.error):  # older OpenCV versions or unsupported backend
+                pass
+            LOGGER.debug("Hardware accelerated video capture unavailable, using default capture.")
+            return cv.VideoCapture(source)
+        video = cv.VideoCapture(source)
+        # live device frames are already buffered by the capture queue, avoid extra latency from the driver buffer
+        # (ignored by backends that do not support it, video files are not affected since they are read on demand)
+        if not video.set(cv.CAP_PROP_BUFFERSIZE, 1):
+            LOGGER.debug("Video capture buffer size could not be reduced for device: [%s]", source)
+        return video
 
     def get(self, setting):
         return self.video.get(setting)
@@ -40,41 +86,133 @@ class VideoCaptureThread(object):
             LOGGER.warning("Threaded video capturing has already been started.")
             return None
         self.started = True
-        self.thread = threading.Thread(target=self.update, args=())
+        # capture runs independently of the UI main loop, and must not keep the application alive once it is closed
+        # decoding itself releases the GIL, so only the minimal per-frame bookkeeping competes with the main loop
+        self.thread = threading.Thread(target=self.update, args=(), name="VideoCapture", daemon=True)
         self.thread.start()
         return self
 
     def update(self):
         last = time.perf_counter()
         while self.started:
-            if not self.queue.full():
-                grabbed, frame = self.video.read()
-                if not grabbed:
-                    return
-                with self.read_lock:
-                    index = int(self.get(cv.CAP_PROP_POS_FRAMES))
-                    msec = self.get(cv.CAP_PROP_POS_MSEC)
-                    self.queue.put((grabbed, frame.copy(), index, msec))
-                    current = time.perf_counter()
-                    delta = current - last
-                    LOGGER.debug("Grab frame: %8s, Last: %8.2f, Time: %8.2f, Real Delta: %6.2fms, Real FPS: %6.2f",
-                                 index, last, current, delta * 1000., 1. / delta)
-                    last = current
+            grabbed = self.video.grab()
+            if not grabbed:
+                break
+            # index is the position of the next frame, as reported by 'CAP_PROP_POS_FRAMES' after a read
+            self.frame_index += 1
+            index = self.frame_index
+            if index % self.skip_factor and index != self.frame_count:
+                continue  # skipped frame, no need to decode it
+            grabbed, frame = self.video.retrieve(self.frames[self.frame_slot])
+            if not grabbed:
+                break
+            if self.frame_fps:
+                msec = (index - 1) * 1000. / self.frame_fps
+            else:
+                msec = self.get(cv.CAP_PROP_POS_MSEC)
+            # no copy needed, the buffer will be reused for capture only once the whole pool was cycled through
+            # consumer can draw on it in place, but must copy it to keep it over more than 'hold_frames' reads
+            self.frames[self.frame_slot] = frame  # allocated by the first capture (or if frame dimensions changed)
+            self.frame_slot = (self.frame_slot + 1) % len(self.frames)
+            if not self.put((grabbed, frame, index, msec)):
+                return
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                current = time.perf_counter()
+                delta = current - last
+                LOGGER.debug("Grab frame: %8s, Last: %8.2f, Time: %8.2f, Real Delta: %6.2fms, Real FPS: %6.2f",
+                             index, last, current, delta * 1000., 1. / delta)
+                last = current
+        else:
+            return
+        # end of stream or capture error, notify the consumer rather than leaving it blocked waiting for a frame
+        self.put((False, None, self.frame_index, self.get(cv.CAP_PROP_POS_MSEC)))
+
+    def put(self, item):
+        """
+        Blocks until the item can be added to the queue, letting it apply back-pressure on the capture.
+
+        Waiting is periodically interrupted to validate whether the capture was stopped in the meantime.
+        Returns whether the item was added.
+        """
+        while self.started:
+            try:
+                self.queue.put(item, timeout=self.wait_timeout)
+                return True
+            except queue.Full:
+                continue
+        return False
 
     def seek(self, frame_index):
-        self.stop()
         # max value -2 to avoid immediate freeze on next fetch
-        frame_index = min(frame_index, self.get(cv.CAP_PROP_FRAME_COUNT) - 2)
-        self.set(cv.CAP_PROP_POS_FRAMES, frame_index)
-        ms = self.get(cv.CAP_PROP_POS_MSEC)
-        with self.read_lock:
-            with self.queue.mutex:
-                self.queue.queue.clear()
+        frame_index = min(frame_index, self.frame_count - 2)
+        ms = self.seek_queued(frame_index)
+        if ms is not None:
+            return ms
+        self.stop()
+        # repositioning the stream requires to decode again from the preceding keyframe up to the requested frame
+        # for short forward jumps (eg: slider moved by a few frames), simply grabbing the frames in between is cheaper
+        distance = frame_index - self.frame_index
+        if 0 <= distance <= self.seek_grab_limit and all(self.video.grab() for _ in range(distance)):
+            self.frame_index = frame_index
+        else:
+            self.set(cv.CAP_PROP_POS_FRAMES, frame_index)
+            self.frame_index = int(self.get(cv.CAP_PROP_POS_FRAMES))
+        # time of the frame that will be read next, computed as in 'update' for the same reference as queued frames
+        # (after repositioning, the stream reports the time of the frame preceding it)
+        if self.frame_fps:
+            ms = self.frame_index * 1000. / self.frame_fps
+        else:
+            ms = self.get(cv.CAP_PROP_POS_MSEC)
+        # capture thread is stopped, no lock required other than the one internal to the queue
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.release_frames()
         self.start()
         return ms
 
-    def read(self):
-        grabbed, frame, index, msec = self.queue.get()
+    def seek_queued(self, frame_index):
+        """
+        Moves to the requested frame if it was already captured ahead in the queue, without interrupting the capture.
+
+        Queued frames preceding it are discarded. Returns the time of the requested frame if it was found,
+        or nothing otherwise, leaving the queue untouched for a regular seek of the video stream.
+        """
+        # the queue's own lock is held to look ahead and drop the frames before the consumer or the capture resume
+        with self.queue.mutex:
+            queued = self.queue.queue
+            for position, (grabbed, _, index, msec) in enumerate(queued):
+                if index - 1 < frame_index:
+                    continue
+                if index - 1 > frame_index or not grabbed:
+                    return None  # skipped or not captured, or end of stream reached
+                for _ in range(position):
+                    queued.popleft()
+                if position:
+                    # capture can only move to next buffers once the item it was putting is queued with this lock
+                    self.release_frames()
+                    self.queue.not_full.notify_all()
+                return msec
+        return None
+
+    def release_frames(self):
+        """
+        Stops reusing the current frame buffers for capture, new ones are allocated as needed.
+
+        Must be called when the capture can resume filling the queue without any consumer reads (e.g.: after a seek),
+        since it would otherwise cycle back to the buffers of the last frames still employed by the consumer.
+        """
+        self.frames = [None] * len(self.frames)
+
+    def read(self, block=True):
+        """
+        Obtains the next captured frame as ``(grabbed, frame, index, msec)``.
+
+        If not blocking, returns ``None`` immediately when the next frame is not yet available.
+        """
+        try:
+            grabbed, frame, index, msec = self.queue.get(block=block)
+        except queue.Empty:
+            return None
         return grabbed, frame, index, msec
 
     def stop(self):
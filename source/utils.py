@@ -1,27 +1,54 @@
 import csv
 import cv2 as cv
+import functools
 import json
+import re
 import tkinter as tk
 import yaml
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 import jsonref
+import numpy as np
+
+try:
+    import orjson  # optional, much faster parsing of large JSON metadata files
+except ImportError:
+    orjson = None
 
 if TYPE_CHECKING:
     from typing import List, Union
 
+# employ the much faster C-implemented loader when PyYAML was built with LibYAML
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+SENTENCE_STOP_REGEX = re.compile(r"(?<=[.!?]) ")
+
 
 def read_metafile(path):
-    with open(path) as meta_file:
-        if path.endswith(".tsv"):
+    if path.endswith(".tsv"):
+        # rows are parsed in a single pass by the C-implemented reader, newline handling is left to it
+        with open(path, newline="") as meta_file:
             reader = csv.reader(meta_file, delimiter="\t", quotechar='"')
-            metadata = [line for line in reader]
-        elif path.endswith(".json"):
-            metadata = jsonref.load(meta_file)
-        else:
-            metadata = yaml.safe_load(meta_file)
-            metadata = jsonref.JsonRef.replace_refs(metadata)
+            return list(reader)
+    # parsers accept the raw UTF-8 bytes, avoid decoding the whole file to text only for it to be encoded back
+    with open(path, "rb") as meta_file:
+        data = meta_file.read()
+    if path.endswith(".json"):
+        metadata = None
+        if orjson is not None:
+            try:
+                metadata = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass  # non-strict values (e.g.: NaN) or invalid contents, let the standard parser handle or report them
+        if metadata is None:
+            metadata = json.loads(data)
+    else:
+        metadata = yaml.load(data, Loader=YamlLoader)
+    # avoid walking the whole document to resolve references when there are none
+    # otherwise, replace them directly by the referred data to avoid proxy object overhead on each later access
+    if b"$ref" in data:
+        metadata = jsonref.replace_refs(metadata, proxies=False)
     return metadata
 
 
@@ -41,11 +68,8 @@ def split_sentences(text):
     """
     Heuristic to generate the list of sentences from a paragraph.
     """
-    punctuations = [".", "!", "?"]
-    for stop in punctuations:
-        text = text.replace("{} ".format(stop), "{}<STOP>".format(stop))
-    sentences = text.split("<STOP>")
-    sentences = [s + "." if s[-1] not in punctuations else s for s in sentences if s]
+    sentences = SENTENCE_STOP_REGEX.split(text)
+    sentences = [s if s[-1] in ".!?" else s + "." for s in sentences if s]
     return sentences
 
 
@@ -54,6 +78,24 @@ def parse_timestamp(timestamp):
     """
     Parses a timestamp with flexible formats.
     """
+    # fast path for expected fixed-width format (THH:MM:SS[.ffffff]), much quicker than 'strptime'
+    # fields must be strictly ASCII digits, since 'int' would also accept signs, spaces and other unicode digits
+    try:
+        if timestamp[0] == "T" and timestamp[3] == ":" and timestamp[6] == ":":
+            fields = [timestamp[1:3], timestamp[4:6], timestamp[7:9]]
+            if len(timestamp) > 9:
+                fraction = timestamp[10:]
+                if timestamp[9] != "." or not fraction or len(fraction) > 6:
+                    raise ValueError
+                fields.append(fraction.ljust(6, "0"))
+            else:
+                fields.append("0")
+            if not all(field.isascii() and field.isdigit() for field in fields):
+                raise ValueError
+            return datetime(1900, 1, 1, *map(int, fields))
+    except (IndexError, ValueError):
+        pass
+    # fallback for any other variation
     try:
         return datetime.strptime(timestamp, "T%H:%M:%S.%f")
     except ValueError:
@@ -74,10 +116,17 @@ def seconds2timestamp(sec):
     Converts seconds into the corresponding ISO time (THH:MM:SS[.fffff]).
     """
     assert sec <= 86400, "Unsupported seconds longer then a day."
-    ts = str(timedelta(seconds=sec))
-    if (len(ts.split(".")[0])) == 7:
-        ts = "0" + ts
-    return "T" + ts
+    # same microseconds rounding as "timedelta" would apply, but without parsing back its string representation
+    whole = int(sec)
+    micro = round((sec - whole) * 1000000)
+    if micro == 1000000:
+        whole += 1
+        micro = 0
+    minutes, seconds = divmod(whole, 60)
+    hours, minutes = divmod(minutes, 60)
+    if micro:
+        return "T{:02d}:{:02d}:{:02d}.{:06d}".format(hours, minutes, seconds, micro)
+    return "T{:02d}:{:02d}:{:02d}".format(hours, minutes, seconds)
 
 
 def timestamp2srt(ts):
@@ -96,58 +145,145 @@ def timestamp2srt(ts):
     return ts[1:]  # remove 'T'
 
 
+@functools.lru_cache(maxsize=4096)
+def get_text_size(text, font_scale, font_thickness):
+    """
+    Obtains the rendered dimensions of a label text, cached since the same labels are drawn over many frames.
+    """
+    return cv.getTextSize(text, fontFace=cv.FONT_HERSHEY_SIMPLEX, fontScale=font_scale, thickness=font_thickness)
+
+
 def draw_bbox(image, tl, br, text, color,
               box_thickness=2, box_contour=True, box_dash_gap=None,
               font_thickness=1, font_scale=0.4, font_contour=True):
     """
     Draws a single bounding box on a given image with added text label in the corner.
+
+    .. seealso::
+        :func:`make_bbox_drawer` to obtain the drawing function directly when repeatedly using the same options.
     """
-    # fix float positions
-    tl = (round(float(tl[0])), round(float(tl[1])))
-    br = (round(float(br[0])), round(float(br[1])))
-
-    # draw label with background rectangle to ensure it is visible
-    text_size, baseline = cv.getTextSize(text, fontFace=cv.FONT_HERSHEY_SIMPLEX,
-                                         fontScale=font_scale, thickness=font_thickness)
-    text_bl = (tl[0] + box_thickness + 1, tl[1] + text_size[1] + box_thickness + 1)
-    # note: text will overflow if box is too small
-    text_box_br = (text_bl[0] + text_size[0] + box_thickness, text_bl[1] + box_thickness * 2)
-    cv.rectangle(image, (tl[0] - 1, tl[1] - 1), (text_box_br[0] + 1, text_box_br[1] + 1),
-                 color=(0, 0, 0), thickness=-1)
+    drawer = make_bbox_drawer(box_thickness, box_contour, box_dash_gap, font_thickness, font_scale, font_contour)
+    drawer(image, tl, br, text, color)
+
+
+@functools.lru_cache(maxsize=64)
+def make_bbox_drawer(box_thickness=2, box_contour=True, box_dash_gap=None,
+                     font_thickness=1, font_scale=0.4, font_contour=True):
+    """
+    Generates a bounding box drawing function specialized for the provided style options.
+
+    All styling conditions are resolved once when generating the function rather than for every drawn bounding box.
+    The returned function takes the ``(image, tl, br, text, color)`` arguments of :func:`draw_bbox`.
+    """
+    font = cv.FONT_HERSHEY_SIMPLEX
+    black = (0, 0, 0)
+    white = (255, 255, 255)
+
+    # draw label background rectangle to ensure it is visible, with box contour if requested
     if box_contour:
-        cv.rectangle(image, tl, br, color=(0, 0, 0), thickness=box_thickness + 1)
-    cv.rectangle(image, tl, text_box_br, color=color, thickness=-1)
+        def draw_backdrop(image, tl, br, text_box_br):
+            cv.rectangle(image, (tl[0] - 1, tl[1] - 1), (text_box_br[0] + 1, text_box_br[1] + 1),
+                         color=black, thickness=-1)
+            cv.rectangle(image, tl, br, color=black, thickness=box_thickness + 1)
+    else:
+        def draw_backdrop(image, tl, br, text_box_br):  # noqa
+            cv.rectangle(image, (tl[0] - 1, tl[1] - 1), (text_box_br[0] + 1, text_box_br[1] + 1),
+                         color=black, thickness=-1)
+
     # label text itself can be either white with black contour,
     # or simply black assuming lighter rectangle background color
     if font_contour:
-        cv.putText(image, text, text_bl, fontFace=cv.FONT_HERSHEY_SIMPLEX, fontScale=font_scale,
-                   color=(0, 0, 0), thickness=font_thickness + 1)
-        cv.putText(image, text, text_bl, fontFace=cv.FONT_HERSHEY_SIMPLEX, fontScale=font_scale,
-                   color=(255, 255, 255), thickness=font_thickness)
+        def draw_text(image, text, text_bl):
+            cv.putText(image, text, text_bl, fontFace=font, fontScale=font_scale,
+                       color=black, thickness=font_thickness + 1)
+            cv.putText(image, text, text_bl, fontFace=font, fontScale=font_scale,
+                       color=white, thickness=font_thickness)
     else:
-        cv.putText(image, text, text_bl, fontFace=cv.FONT_HERSHEY_SIMPLEX, fontScale=font_scale,
-                   color=(0, 0, 0), thickness=font_thickness)
+        def draw_text(image, text, text_bl):
+            cv.putText(image, text, text_bl, fontFace=font, fontScale=font_scale,
+                       color=black, thickness=font_thickness)
 
-    # draw surrounding box
+    # surrounding box
     if isinstance(box_dash_gap, int):
-        x1, y1, x2, y2 = tl[0], tl[1], br[0], br[1]
-        dx = x1
-        dy = y1
-        corner = 2  # leave some space for a single dot in corners
-        while dx + corner < x2:
-            cv.line(image, (dx, y1), (dx + corner, y1), color, box_thickness, lineType=8, shift=0)
-            cv.line(image, (dx, y2), (dx + corner, y2), color, box_thickness, lineType=8, shift=0)
-            dx += box_dash_gap + corner
-        while dy + corner < y2:
-            cv.line(image, (x1, dy), (x1, dy + corner), color, box_thickness, lineType=8, shift=0)
-            cv.line(image, (x2, dy), (x2, dy + corner), color, box_thickness, lineType=8, shift=0)
-            dy += box_dash_gap + corner
-        cv.line(image, (x1, y1), (x1, y1), color, box_thickness, lineType=8, shift=0)
-        cv.line(image, (x1, y2), (x1, y2), color, box_thickness, lineType=8, shift=0)
-        cv.line(image, (x2, y1), (x2, y1), color, box_thickness, lineType=8, shift=0)
-        cv.line(image, (x2, y2), (x2, y2), color, box_thickness, lineType=8, shift=0)
+        def draw_box(image, tl, br, color):
+            draw_dashed_rect(image, tl, br, color, thickness=box_thickness, dash_gap=box_dash_gap)
     else:
-        cv.rectangle(image, tl, br, color=color, thickness=box_thickness)
+        def draw_box(image, tl, br, color):
+            cv.rectangle(image, tl, br, color=color, thickness=box_thickness)
+
+    def draw(image, tl, br, text, color):
+        # fix float positions
+        tl = (round(float(tl[0])), round(float(tl[1])))
+        br = (round(float(br[0])), round(float(br[1])))
+
+        text_size, _ = get_text_size(text, font_scale, font_thickness)
+        text_bl = (tl[0] + box_thickness + 1, tl[1] + text_size[1] + box_thickness + 1)
+        # note: text will overflow if box is too small
+        text_box_br = (text_bl[0] + text_size[0] + box_thickness, text_bl[1] + box_thickness * 2)
+        draw_backdrop(image, tl, br, text_box_br)
+        cv.rectangle(image, tl, text_box_br, color=color, thickness=-1)
+        draw_text(image, text, text_bl)
+        draw_box(image, tl, br, color)
+
+    return draw
+
+
+def draw_dashed_rect(image, tl, br, color, thickness=1, dash_gap=5):
+    """
+    Draws a dashed rectangle by writing dash pixels directly into the image array.
+
+    All dash pixel coordinates are computed at once to write them in a single vectorized assignment, avoiding the
+    overhead of calling the OpenCV line drawing operation for every small dash segment.
+    """
+    height, width = image.shape[:2]
+    for rows, cols in get_dashed_rect_indices(tuple(tl), tuple(br), thickness, dash_gap, width, height):
+        image[rows, cols] = color
+
+
+@functools.lru_cache(maxsize=64)
+def get_line_footprint(dx, dy, thickness):
+    """
+    Obtains the pixel offsets drawn by :func:`cv.line` from the origin to ``(dx, dy)`` with the given thickness.
+
+    Lines are rendered once on a small canvas to reproduce exactly the pixels (including rounded caps of thick lines)
+    that OpenCV would draw for any translation of that same line.
+    """
+    margin = thickness + 2
+    canvas = np.zeros((dy + margin * 2 + 1, dx + margin * 2 + 1), dtype=np.uint8)
+    cv.line(canvas, (margin, margin), (margin + dx, margin + dy), 1, thickness, lineType=8, shift=0)
+    rows, cols = np.nonzero(canvas)
+    return rows - margin, cols - margin
+
+
+@functools.lru_cache(maxsize=256)
+def get_dashed_rect_indices(tl, br, thickness, dash_gap, width, height):
+    """
+    Generates the pixel index arrays of dashes and corner dots of a rectangle within an image of given dimensions.
+
+    Results are cached since the same rectangles are usually drawn over many consecutive video frames.
+    """
+    x1, y1, x2, y2 = tl[0], tl[1], br[0], br[1]
+    corner = 2  # leave some space for a single dot in corners
+    step = dash_gap + corner
+    dash_x = np.arange(x1, x2 - corner, step)
+    dash_y = np.arange(y1, y2 - corner, step)
+    # dash start points along each border, grouped by the line footprint drawn from them
+    points = [
+        (get_line_footprint(corner, 0, thickness),
+         np.concatenate([np.full(len(dash_x), y1), np.full(len(dash_x), y2)]),
+         np.concatenate([dash_x, dash_x])),
+        (get_line_footprint(0, corner, thickness),
+         np.concatenate([dash_y, dash_y]),
+         np.concatenate([np.full(len(dash_y), x1), np.full(len(dash_y), x2)])),
+        (get_line_footprint(0, 0, thickness),
+         np.array([y1, y2, y1, y2]),
+         np.array([x1, x1, x2, x2])),
+    ]
+    rows = np.concatenate([(y[:, None] + fr).ravel() for (fr, _), y, _ in points])
+    cols = np.concatenate([(x[:, None] + fc).ravel() for (_, fc), _, x in points])
+    # drop out of bound pixels instead of letting negative indices wrap around
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    return ((rows[inside], cols[inside]),)
 
 
 class ToolTip:
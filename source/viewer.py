@@ -2,6 +2,8 @@
 Minimalistic video player that allows visualization and easier interpretation of FAR-VVD results.
 """
 import argparse
+import bisect
+import concurrent.futures
 import difflib
 import itertools
 import logging
@@ -13,7 +15,7 @@ import time
 import uuid
 from utils import (
     ToolTip,
-    draw_bbox,
+    make_bbox_drawer,
     parse_timestamp,
     read_metafile,
     seconds2timestamp,
@@ -22,7 +24,7 @@ from utils import (
     timestamp2srt,
     write_metafile
 )
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import cv2 as cv
 import PIL.Image
@@ -54,6 +56,8 @@ class VideoResultPlayerApp(object):
     video_width = None
     video_height = None
     video_frame = None
+    video_resized = None
+    video_interpolation = cv.INTER_NEAREST
     video_duration = None
     frame = None
     frame_fps = 0
@@ -65,6 +69,8 @@ class VideoResultPlayerApp(object):
     frame_output = None
     frame_drop_factor = 4
     frame_skip_factor = 1
+    frame_dropped = 0
+    play_clock = None
     last_time = 0
     next_time = 0
     call_cumul_count = 0
@@ -79,15 +85,20 @@ class VideoResultPlayerApp(object):
     video_infer_meta = None
     video_infer_indices = None  # type: Optional[List[int]]
     video_infer_multi = None    # type: Optional[List[bool]]
+    video_infer_lines = None    # type: Optional[Dict[Tuple[int, int, int], List[str]]]
     text_annot_meta = None
     text_annot_index = None     # type: Optional[int]
     text_infer_meta = None
     text_infer_index = None     # type: Optional[int]
     mapping_label = None        # type: Optional[Dict[str, str]]
     mapping_regex = None        # type: Optional[Dict[re.Pattern, str]]
+    mapping_cache = None        # type: Optional[Dict[str, str]]
+    metadata_next_time = None   # type: Optional[float]
+    metadata_times = None       # type: Optional[Dict[int, Tuple[List[Dict[str, Any]], List[float]]]]
     # handles to UI elements
     window = None
     video_viewer = None
+    video_viewer_image = None
     video_slider = None
     video_desc_label = None
     video_desc_scrollY = None
@@ -100,14 +111,24 @@ class VideoResultPlayerApp(object):
     text_annot_scrollX = None
     text_annot_scrollY = None
     text_annot_textbox = None
+    textbox_contents = None     # type: Optional[Dict[str, str]]
     snapshot_button = None
+    snapshot_writer = None      # type: Optional[concurrent.futures.ThreadPoolExecutor]
     checkbox_regions = None
     checkbox_regions_central = None
     display_regions = None
     display_regions_central = None
     display_colors = None
+    display_drawer_solid = None
+    display_drawer_dashed = None
+    display_info_title = None
+    display_info_total = None
+    display_info_second = None
+    display_info_current = None
+    display_regions_cache = None  # type: Optional[Dict[Tuple[int, int], Tuple[float, float, float, List[Any]]]]
     play_button = None
     play_state = True
+    play_job = None
     play_label = None
     play_text = None
     font_header = ("Helvetica", 16, "bold")
@@ -181,7 +202,14 @@ class VideoResultPlayerApp(object):
 
     def setup_player(self):
         LOGGER.info("Creating player...")
-        self.video = VideoCaptureThread(self.video_source, queue_size=self.frame_queue).start()
+        # ensure SIMD optimized code paths are employed for frame operations, in case they were disabled globally
+        if not cv.useOptimized():
+            LOGGER.debug("Enabling OpenCV optimized code.")
+            cv.setUseOptimized(True)
+        # displayed frame is kept for snapshots while up to the maximum of consecutive dropped frames are read after it
+        self.video = VideoCaptureThread(self.video_source, queue_size=self.frame_queue,
+                                        skip_factor=self.frame_skip_factor,
+                                        hold_frames=self.frame_drop_factor + 1).start()
         self.frame_index = 0
         self.frame_time = 0.0
         real_fps = self.video.get(cv.CAP_PROP_FPS)
@@ -197,6 +225,11 @@ class VideoResultPlayerApp(object):
             LOGGER.warning("Readjusting video scale [%.3f] to [%.3f] to ensure minimal width [480px].",
                            self.video_scale, new_scale)
             self.video_scale = new_scale
+        # area interpolation gives a much better downscale quality (eg: smooth bbox labels) at the same cost as the
+        # nearest one only when the scale is an exact integer fraction, otherwise it is many times slower
+        inverse_scale = 1. / self.video_scale
+        if self.video_scale < 1 and inverse_scale == round(inverse_scale):
+            self.video_interpolation = cv.INTER_AREA
 
     def setup_window(self):
         LOGGER.info("Creating window...")
@@ -236,6 +269,9 @@ class VideoResultPlayerApp(object):
         # Create a canvas that can fit the above video source size
         self.video_viewer = tk.Canvas(panel_video_viewer, width=display_width, height=display_height)
         self.video_viewer.pack(anchor=tk.NW, fill=tk.BOTH, expand=True)
+        # single persistent image displayed by the canvas, frames are pasted into it rather than recreated each time
+        self.frame = PIL.ImageTk.PhotoImage(PIL.Image.new("RGB", (display_width, display_height)))
+        self.video_viewer_image = self.video_viewer.create_image(0, 0, image=self.frame, anchor=tk.NW)
         # adjust number of labels displayed on slider with somewhat dynamic amount based on video display scaling
         slider_interval = self.frame_count // round(10 * self.video_scale)
         slider_elements = self.frame_count // slider_interval
@@ -289,7 +325,7 @@ class VideoResultPlayerApp(object):
         self.video_desc_label.pack(side=tk.TOP, fill=tk.X)
         video_desc_xy_scroll_box = tk.Frame(panel_video_desc, padx=0, pady=0)
         video_desc_xy_scroll_box.pack(fill=tk.BOTH, expand=True)
-        self.video_desc_textbox = tk.Text(video_desc_xy_scroll_box, height=10, wrap=tk.WORD)
+        self.video_desc_textbox = tk.Text(video_desc_xy_scroll_box, height=10, wrap=tk.WORD, state=tk.DISABLED)
         self.video_desc_scrollY = tk.Scrollbar(video_desc_xy_scroll_box, command=self.video_desc_textbox.yview)
         self.video_desc_textbox.configure(yscrollcommand=self.video_desc_scrollY.set)
         self.video_desc_textbox.tag_configure(self.font_code_tag, font=self.font_code)
@@ -305,7 +341,7 @@ class VideoResultPlayerApp(object):
         self.video_infer_label.pack(side=tk.TOP, fill=tk.X)
         video_infer_xy_scroll_box = tk.Frame(panel_video_infer, padx=0, pady=0)
         video_infer_xy_scroll_box.pack(fill=tk.BOTH, expand=True)
-        self.video_infer_textbox = tk.Text(video_infer_xy_scroll_box, wrap=tk.NONE)
+        self.video_infer_textbox = tk.Text(video_infer_xy_scroll_box, wrap=tk.NONE, state=tk.DISABLED)
         self.video_infer_scrollX = tk.Scrollbar(video_infer_xy_scroll_box, orient=tk.HORIZONTAL,
                                                 command=self.video_infer_textbox.xview)
         self.video_infer_scrollY = tk.Scrollbar(video_infer_xy_scroll_box, orient=tk.VERTICAL,
@@ -326,7 +362,7 @@ class VideoResultPlayerApp(object):
         self.text_annot_label.pack(side=tk.TOP, fill=tk.X)
         text_annot_xy_scroll_box = tk.Frame(panel_text_annot, padx=0, pady=0)
         text_annot_xy_scroll_box.pack(fill=tk.BOTH, expand=True)
-        self.text_annot_textbox = tk.Text(text_annot_xy_scroll_box, wrap=tk.NONE)
+        self.text_annot_textbox = tk.Text(text_annot_xy_scroll_box, wrap=tk.NONE, state=tk.DISABLED)
         self.text_annot_scrollX = tk.Scrollbar(text_annot_xy_scroll_box, orient=tk.HORIZONTAL,
                                                command=self.text_annot_textbox.xview)
         self.text_annot_scrollY = tk.Scrollbar(text_annot_xy_scroll_box, orient=tk.VERTICAL,
@@ -367,6 +403,7 @@ class VideoResultPlayerApp(object):
                      index, event.x, event.y, coord_min, coord_max)
         self.seek_frame(index)
         self.play_state = True   # resume
+        self.resume_video()
 
     def toggle_playing(self):
         if self.play_state:
@@ -376,9 +413,44 @@ class VideoResultPlayerApp(object):
             self.play_text.set("PAUSE")
             LOGGER.debug("Video resume.")
         self.play_state = not self.play_state
+        self.play_clock = None  # resync playback time on resume
+        if self.play_state:
+            self.resume_video()
+
+    def resume_video(self):
+        """
+        Restarts the video loop if it was stopped while paused, otherwise it is still scheduled and resumes by itself.
+        """
+        if self.play_job is None:
+            self.play_job = self.window.after(1, self.update_video)
+
+    def update_textbox(self, textbox, text, tag):
+        # type: (tk.Text, str, str) -> None
+        """
+        Replaces the displayed text box contents, only modifying the part that differs from the previous text.
+
+        Text boxes are read-only to ensure their contents always match the previous text they are compared against,
+        edition is only enabled while they are updated.
+        """
+        if self.textbox_contents is None:
+            self.textbox_contents = {}
+        previous = self.textbox_contents.get(str(textbox))
+        if previous == text:
+            return
+        self.textbox_contents[str(textbox)] = text
+        textbox.configure(state=tk.NORMAL)
+        if previous is None:
+            textbox.delete("1.0", tk.END)
+            textbox.insert(tk.END, text, tag)
+        else:
+            prefix = len(os.path.commonprefix([previous, text]))
+            suffix = len(os.path.commonprefix([previous[prefix:][::-1], text[prefix:][::-1]]))
+            start = "1.0+{}c".format(prefix)
+            end = "1.0+{}c".format(len(previous) - suffix)
+            textbox.replace(start, end, text[prefix:len(text) - suffix], tag)
+        textbox.configure(state=tk.DISABLED)
 
     def update_video_desc(self, metadata=None, indices=None):
-        self.video_desc_textbox.delete("1.0", tk.END)
         if not metadata or not indices:
             text = self.NO_DATA_TEXT
         elif indices[0] == self.NO_DATA_INDEX:
@@ -392,8 +464,7 @@ class VideoResultPlayerApp(object):
             # display plain video description text
             entry = "(index: {}, start: {:.2f}, end: {:.2f})".format(index, metadata["start"], metadata["end"])
             text = "{}\n\n{}".format(entry, metadata["vd"])
-        self.video_desc_textbox.insert(tk.END, text, self.font_normal_tag)
-        self.video_desc_textbox.insert(tk.END, "", self.font_code_tag)
+        self.update_textbox(self.video_desc_textbox, text, self.font_normal_tag)
 
     def format_video_infer(self, number, index, metadata, multi):
         """
@@ -409,6 +480,13 @@ class VideoResultPlayerApp(object):
             return [template.format(number, len(metadata)), self.NO_MORE_TEXT]
         if index == self.NO_DATA_INDEX:
             return [template.format(number, "n/a"), self.NO_DATA_TEXT]
+        # entries are displayed again each time they are reached (seek, repeated/overlapping segments)
+        # formatted lines only depend on the entry, so generate them only once
+        if self.video_infer_lines is None:
+            self.video_infer_lines = {}
+        lines = self.video_infer_lines.get((number, index, multi))
+        if lines is not None:
+            return lines
         meta = metadata[index]
         info = ""
         entry = template.format(number, index)
@@ -419,7 +497,9 @@ class VideoResultPlayerApp(object):
             info = str(tuple(meta["bbox"]))
         values = ["[{:.2f}] {}".format(s, c)
                   for c, s in zip(meta["classes"], meta["scores"])]
-        return [entry, times, info, "", header] + values
+        lines = [entry, times, info, "", header] + values
+        self.video_infer_lines[(number, index, multi)] = lines
+        return lines
 
     @staticmethod
     def flatten_video_meta(indices, metadata, regions):
@@ -441,50 +521,43 @@ class VideoResultPlayerApp(object):
         :return: tuple of flattened (file indices, index of predictions set, corresponding metadata, region index)
         """
         multi_indices = [len(metadata[n][indices[n]]["regions"]) if regions[n] else -1 for n in range(len(metadata))]
-        flatten_metadata = []
-        flatten_indices = []
-        flatten_number = []
-        flatten_regions = []
+        # single pass generating rows of (number, index, metadata, region), then transposed to the flattened lists
+        flatten_rows = []
+        repeat = itertools.repeat
         for i, count in enumerate(multi_indices):
             if count < 0:
-                flatten_metadata.append(metadata[i])
-                flatten_indices.append(indices[i])
-                flatten_number.append(i)
-                flatten_regions.append(-1)
+                flatten_rows.append((i, indices[i], metadata[i], -1))
             else:
-                flatten_metadata.extend([metadata[i]] * count)
-                flatten_indices.extend([indices[i]] * count)
-                flatten_number.extend([i] * count)
-                flatten_regions.extend(list(range(count)))
+                flatten_rows.extend(zip(repeat(i, count), repeat(indices[i], count), repeat(metadata[i], count),
+                                        range(count)))
+        if not flatten_rows:
+            return [], [], [], []
+        flatten_number, flatten_indices, flatten_metadata, flatten_regions = map(list, zip(*flatten_rows))
         return flatten_number, flatten_indices, flatten_metadata, flatten_regions
 
     def update_video_infer(self, metadata=None, indices=None):
         """
         Format video inference metadata entries side-by-side from N sources.
         """
-        self.video_infer_textbox.delete("1.0", tk.END)
         if not metadata or not indices:
             text = self.NO_DATA_TEXT
         else:
-            text = ""
+            format_infer = self.format_video_infer
             meta_lines = [
-                self.format_video_infer(number, index, meta, multi)
+                format_infer(number, index, meta, multi)
                 for (number, index, meta, multi)
                 in zip(*self.flatten_video_meta(indices, metadata, self.video_infer_multi))
             ]
             # display lines ordered from top-1 to lowest top-k, with possibility variable amounts for each
             max_lines = max([len(lines) for lines in meta_lines])
-            for line_index in range(max_lines):
-                for meta in meta_lines:
-                    line = meta[line_index] if line_index < len(meta) else ""
-                    # reasonable padding to align columns, adjust if class names are too long to display
-                    text += "{:<32s}".format(line)
-                text += "\n"
-        self.video_infer_textbox.insert(tk.END, "", self.font_normal_tag)
-        self.video_infer_textbox.insert(tk.END, text, self.font_code_tag)
+            pad_line = "{:<32s}".format  # reasonable padding to align columns, adjust if class names are too long
+            text = "".join([
+                "".join([pad_line(meta[line_index] if line_index < len(meta) else "") for meta in meta_lines]) + "\n"
+                for line_index in range(max_lines)
+            ])
+        self.update_textbox(self.video_infer_textbox, text, self.font_code_tag)
 
     def update_text_annot(self, metadata=None, indices=None):
-        self.text_annot_textbox.delete("1.0", tk.END)
         if not metadata or not indices:
             text = self.NO_DATA_TEXT
         elif indices[0] == self.NO_DATA_INDEX:
@@ -501,9 +574,10 @@ class VideoResultPlayerApp(object):
             fields = ["POS", "type", "lemme"]
             header = fmt.format(*fields)
             entry = "(index: {}, start: {:.2f}, end: {:.2f})".format(index, metadata["start"], metadata["end"])
-            text = "{}\n\n{}\n{}\n".format(entry, header, "_" * len(header))
+            # accumulate parts to join them once, repeated string concatenation is quadratic on large annotations
+            parts = ["{}\n\n{}\n{}\n".format(entry, header, "_" * len(header))]
             for i, annot in enumerate(annotations):
-                text += "\n[{}]: {}\n".format(i, annot["sentence"])
+                parts.append("\n[{}]: {}\n".format(i, annot["sentence"]))
                 tokens = annot.get("words", annot.get("tokens", []))  # pre/post app version 1.x
                 for item in tokens:
                     if "POS" in fields and "pos" in item:
@@ -513,9 +587,9 @@ class VideoResultPlayerApp(object):
                     if "iob" in fields:
                         item = dict(item)  # copy to edit and leave original intact
                         item["iob"] = ", ".join(item["iob"])  # can have multiple annotations
-                    text += "\n" + fmt.format(*[item[f] for f in fields])
-        self.text_annot_textbox.insert(tk.END, "", self.font_normal_tag)
-        self.text_annot_textbox.insert(tk.END, text, self.font_code_tag)
+                    parts.append("\n" + fmt.format(*[item[f] for f in fields]))
+            text = "".join(parts)
+        self.update_textbox(self.text_annot_textbox, text, self.font_code_tag)
 
     def update_metadata(self, seek=False):
         def update_meta(meta_container, meta_index, meta_updater):
@@ -540,31 +614,29 @@ class VideoResultPlayerApp(object):
                 must_update = False
                 computed_indices = []
                 for i, index in enumerate(meta_index):
+                    metas = meta_container[i]
                     current_index = 0 if seek else index
                     updated_index = current_index  # if nothing needs to change (current is still valid for timestamp)
-                    index_total = len(meta_container[i])
+                    index_total = len(metas)
                     if seek:
                         # search the earliest index that provides metadata within the new time
                         must_update = True
-                        updated_index = self.NO_MORE_INDEX  # default if not found
-                        for idx in range(index_total):
-                            meta = meta_container[i][idx]
-                            if meta[self.ts_key] >= self.frame_time:
-                                updated_index = idx
-                                break
-                        else:
+                        updated_index = bisect.bisect_left(self.get_metadata_times(metas), frame_time)
+                        if updated_index == index_total:
                             # validate meta is within time range of last entry, or out of scope
-                            if meta_container[i][updated_index][self.te_key] >= self.frame_time:
-                                updated_index = len(meta_container[i]) - 1
+                            if metas[-1][te_key] >= frame_time:
+                                updated_index = index_total - 1
+                            else:
+                                updated_index = no_more_index
                     else:
                         # if next index exceeds the list, entries are exhausted
-                        if current_index == self.NO_MORE_INDEX or current_index >= index_total:
-                            computed_indices.append(self.NO_MORE_INDEX)  # set for following iterations
-                            must_update = current_index == self.NO_MORE_INDEX  # updated last iteration
+                        if current_index == no_more_index or current_index >= index_total:
+                            computed_indices.append(no_more_index)  # set for following iterations
+                            must_update = current_index == no_more_index  # updated last iteration
                             continue
                         # otherwise bump to next one if timestamp of the current is passed
-                        current_meta = meta_container[i][current_index]  # type: dict
-                        if self.frame_time > current_meta[self.te_key]:
+                        current_meta = metas[current_index]  # type: dict
+                        if frame_time > current_meta[te_key]:
                             updated_index = current_index + 1
 
                     # apply change of metadata, update all stack of metadata type if any must be changed
@@ -576,9 +648,57 @@ class VideoResultPlayerApp(object):
                 return computed_indices
             return self.NO_DATA_INDEX
 
+        # nothing can change until the end time of one of the active entries is passed, unless seeking somewhere else
+        frame_time = self.frame_time
+        if not seek and self.metadata_next_time is not None and frame_time <= self.metadata_next_time:
+            return
+
+        # resolve references shared by all metadata lookups only once
+        te_key = self.te_key
+        no_more_index = self.NO_MORE_INDEX
         self.video_desc_index = update_meta(self.video_desc_meta, self.video_desc_index, self.update_video_desc)
         self.video_infer_indices = update_meta(self.video_infer_meta, self.video_infer_indices, self.update_video_infer)
         self.text_annot_index = update_meta(self.text_annot_meta, self.text_annot_index, self.update_text_annot)
+        self.metadata_next_time = self.get_metadata_next_time()
+
+    def get_metadata_next_time(self):
+        # type: () -> Optional[float]
+        """
+        Obtains the earliest end time of currently active metadata entries, after which any of them could change.
+
+        If any entry is exhausted or transitioning to exhausted state, nothing is returned to enforce a full update
+        check.
+        """
+        next_time = float("inf")
+        for meta_container, meta_index in [(self.video_desc_meta, self.video_desc_index),
+                                           (self.video_infer_meta, self.video_infer_indices),
+                                           (self.text_annot_meta, self.text_annot_index)]:
+            if not meta_container or meta_index == self.NO_DATA_INDEX:
+                continue
+            if not isinstance(meta_index, list):
+                meta_index = [meta_index]
+            if not isinstance(meta_container[0], list):
+                meta_container = [meta_container]
+            for metas, index in zip(meta_container, meta_index):
+                if index is None:
+                    continue
+                if index == self.NO_MORE_INDEX or index >= len(metas):
+                    return None
+                next_time = min(next_time, metas[index][self.te_key])
+        return next_time
+
+    def get_metadata_times(self, metadata):
+        # type: (List[Dict[str, Any]]) -> List[float]
+        """
+        Obtains the sorted start times of the metadata entries, computed only once for each metadata list.
+        """
+        if self.metadata_times is None:
+            self.metadata_times = {}
+        cached = self.metadata_times.get(id(metadata))
+        if cached is None or cached[0] is not metadata:
+            cached = (metadata, [meta[self.ts_key] for meta in metadata])
+            self.metadata_times[id(metadata)] = cached
+        return cached[1]
 
     def display_frame_info(self, frame, current_fps, average_fps):
         """
@@ -589,12 +709,20 @@ class VideoResultPlayerApp(object):
         font_scale = 0.5
         font_color = (209, 80, 0, 255)
         font_stroke = 1
-        text0 = "Title: {}".format(self.video_title)
-        text1 = "Original FPS: {}, Process FPS: {:0.2f} ({:0.2f})".format(self.frame_fps, current_fps, average_fps)
         cur_sec = self.frame_time / 1000.
         tot_sec = self.video_duration / 1000.
-        cur_hms = time.strftime("%H:%M:%S", time.gmtime(cur_sec))
-        tot_hms = time.strftime("%H:%M:%S", time.gmtime(tot_sec))
+        # static parts are generated only once, after the title could have been updated from metadata
+        if self.display_info_title is None:
+            self.display_info_title = "Title: {}".format(self.video_title)
+            self.display_info_total = time.strftime("%H:%M:%S", time.gmtime(tot_sec))
+        # current time only changes every second (many frames)
+        if int(cur_sec) != self.display_info_second:
+            self.display_info_second = int(cur_sec)
+            self.display_info_current = time.strftime("%H:%M:%S", time.gmtime(cur_sec))
+        cur_hms = self.display_info_current
+        tot_hms = self.display_info_total
+        text0 = self.display_info_title
+        text1 = "Original FPS: {}, Process FPS: {:0.2f} ({:0.2f})".format(self.frame_fps, current_fps, average_fps)
         text2 = "Time: {:0>.2f}/{:0.2f} ({}/{}) Frame: {}".format(cur_sec, tot_sec, cur_hms, tot_hms, self.frame_index)
         for text_row, text in [(0, text0), (-2, text1), (-1, text2)]:
             y_offset = round(text_delta * font_scale) * text_row
@@ -619,32 +747,52 @@ class VideoResultPlayerApp(object):
             |-----------|======|======|-----------|
 
         """
-        only_center = self.display_regions_central.get()
+        if not self.video_infer_indices:
+            return
+        only_center = None  # only query the UI option when needed
+        frame_time = self.frame_time
+        dt = 1000  # ms
         for i, video_meta_index in enumerate(self.video_infer_indices):
-            if self.video_infer_multi[i]:
-                meta = self.video_infer_meta[i][video_meta_index]
-                ts = meta["start_ms"]
-                te = meta["end_ms"]
-                # skip if region time is not yet reached or is passed
-                if self.frame_time < ts or te < self.frame_time:
-                    continue
-                dt = 1000  # ms
-                tc = ts + (te - ts) / 2
-                ts_dt = tc - dt
-                te_dt = tc + dt
-                dash = 5  # dash spacing if not within ±dt, otherwise filled
-                if ts_dt <= self.frame_time <= te_dt:
-                    dash = None
-                if only_center and dash:
+            if not self.video_infer_multi[i] or video_meta_index == self.NO_DATA_INDEX:
+                continue
+            ts, te, tc, regions = self.get_frame_regions(i, video_meta_index)
+            # skip if region time is not yet reached or is passed
+            if frame_time < ts or te < frame_time:
+                continue
+            dashed = abs(frame_time - tc) > dt  # dashed if not within ±dt, otherwise filled
+            if dashed:
+                if only_center is None:
+                    only_center = self.display_regions_central.get()
+                if only_center:
                     continue  # skip draw dashed bounding box if not within ±dt when not requested
-                for r, region in enumerate(meta["regions"]):
-                    tl = (region["bbox"][0], region["bbox"][1])
-                    br = (region["bbox"][2], region["bbox"][3])
-                    color = self.display_colors[r % len(self.display_colors)]
-                    label = "file: {}, bbox: {}".format(i, r)
-                    draw_bbox(frame, tl, br, label, color,
-                              box_thickness=1, box_dash_gap=dash, box_contour=False,
-                              font_thickness=1, font_scale=0.5, font_contour=False)
+            draw_bbox = self.display_drawer_dashed if dashed else self.display_drawer_solid
+            for tl, br, label, color in regions:
+                draw_bbox(frame, tl, br, label, color)
+
+    def get_frame_regions(self, number, index):
+        # type: (int, int) -> Tuple[float, float, float, List[Tuple[Any, ...]]]
+        """
+        Obtains the start, end and center times, and drawing parameters of bounding boxes of a video inference entry.
+
+        Parameters are generated only once for each entry since they are repeatedly drawn over every frame it spans.
+        """
+        if self.display_regions_cache is None:
+            self.display_regions_cache = {}
+        entry = self.display_regions_cache.get((number, index))
+        if entry is None:
+            meta = self.video_infer_meta[number][index]
+            regions = []
+            for r, region in enumerate(meta["regions"]):
+                tl = (region["bbox"][0], region["bbox"][1])
+                br = (region["bbox"][2], region["bbox"][3])
+                color = self.display_colors[r % len(self.display_colors)]
+                label = "file: {}, bbox: {}".format(number, r)
+                regions.append((tl, br, label, color))
+            ts = meta[self.ts_key]
+            te = meta[self.te_key]
+            entry = (ts, te, ts + (te - ts) / 2, regions)
+            self.display_regions_cache[(number, index)] = entry
+        return entry
 
     def update_video(self):
         """
@@ -652,68 +800,119 @@ class VideoResultPlayerApp(object):
         """
         self.next_time = time.perf_counter()
 
-        # in case of pause button or normal end of video reached, just loop for next event to resume reading video
-        if not self.play_state or self.frame_index >= self.frame_count:
-            self.window.after(30, self.update_video)
+        # in case of pause button, stop looping until resumed to avoid polling the paused state
+        if not self.play_state:
+            self.play_job = None
+            return
+        # in case of normal end of video reached, just loop for next event to resume reading video (eg: seek)
+        if self.frame_index >= self.frame_count:
+            self.play_job = self.window.after(30, self.update_video)
             return
 
-        grabbed, frame, self.frame_index, self.frame_time = self.video.read()
+        # avoid blocking the UI if the next frame is not decoded yet, and let it process events in the meantime
+        captured = self.video.read(block=False)
+        if captured is None:
+            self.play_job = self.window.after(1, self.update_video)
+            return
+        grabbed, frame, index, msec = captured
         if not grabbed:
-            LOGGER.error("Playback error occurred when reading next video frame.")
-            self.error = True
+            # end of stream notified by the capture, reported frame count can be overestimated for some videos
+            # handle it as the normal end of video to let a seek resume playback from another position
+            if index < self.frame_count:
+                LOGGER.error("Video stream ended at frame %s before the expected frame count %s.",
+                             index, self.frame_count)
+            self.frame_index = self.frame_count
+            self.play_job = self.window.after(30, self.update_video)
+            return
+        self.frame_index = index
+        self.frame_time = msec
+
+        # check skipped frames before anything else, no need to evaluate timings for them
+        if self.frame_index % self.frame_skip_factor and self.frame_index not in [0, self.frame_count]:
+            LOGGER.debug("Skip Frame: %8s", self.frame_index)
+            self.play_job = self.window.after(1, self.update_video)
             return
 
         self.next_time = time.perf_counter()
         call_time_delta = self.next_time - self.last_time
         self.last_time = self.next_time
-        # default if cannot be inferred from previous time
-        wait_time_delta = 1 if call_time_delta > self.frame_delta else max(self.frame_delta - call_time_delta, 1)
-        # if delays become too big, drop frames to catch up, ignore first that is always big because no previous one
         call_msec_delta = call_time_delta * 1000.
         call_fps = 1. / call_time_delta
 
-        if self.frame_index not in [0, self.frame_count] and self.frame_index % self.frame_skip_factor:
-            LOGGER.debug("Skip Frame: %8s", self.frame_index)
-            self.window.after(1, self.update_video)
-            return
-
-        if call_msec_delta > self.frame_delta * self.frame_drop_factor and self.frame_index > 1:
-            LOGGER.warning("Drop Frame: %8s, Last: %8.2f, Time: %8.2f, Real Delta: %6.2fms, "
-                           "Target Delta: %6.2fms, Call Delta: %6.2fms, Real FPS: %6.2f",
-                           self.frame_index, self.last_time, self.frame_time, wait_time_delta,
-                           self.frame_delta, call_msec_delta, call_fps)
-            self.window.after(1, self.update_video)
-            return
+        # playback clock anchored on the first frame displayed since playback was last interrupted (pause, seek)
+        now_msec = self.next_time * 1000.
+        if self.play_clock is None:
+            self.play_clock = now_msec - self.frame_time
+        lag_msec = now_msec - self.play_clock - self.frame_time
+
+        # if display lags too much behind the expected video time, drop frames to catch up
+        # limit consecutive drops to still display frames if processing is simply slower than the video, and resync
+        if lag_msec > self.frame_delta * self.frame_drop_factor and self.frame_index > 1:
+            if self.frame_dropped < self.frame_drop_factor:
+                self.frame_dropped += 1
+                LOGGER.warning("Drop Frame: %8s, Last: %8.2f, Time: %8.2f, "
+                               "Target Delta: %6.2fms, Call Delta: %6.2fms, Real FPS: %6.2f, Lag: %6.2fms",
+                               self.frame_index, self.last_time, self.frame_time,
+                               self.frame_delta, call_msec_delta, call_fps, lag_msec)
+                self.play_job = self.window.after(1, self.update_video)
+                return
+            self.play_clock = now_msec - self.frame_time
+        self.frame_dropped = 0
 
         self.call_cumul_value += call_time_delta
         self.call_cumul_count += 1
         call_avg_fps = self.call_cumul_count / self.call_cumul_value
 
+        # overlays are composed here rather than in a separate worker since they depend on the active metadata indices
+        # and display options which are updated by this UI thread, decoding is already handled by the capture thread
         if self.display_regions.get():
             self.display_frame_regions(frame)   # must call before any resize to employ with original bbox dimensions
 
         frame_dims = (self.video_width, self.video_height)
         if self.video_scale != 1:
             frame_dims = (round(self.video_width * self.video_scale), round(self.video_height * self.video_scale))
-            frame = cv.resize(frame, frame_dims, interpolation=cv.INTER_NEAREST)
-
-        LOGGER.debug("Show Frame: %8s, Last: %8.2f, Time: %8.2f, Real Delta: %6.2fms, "
-                     "Target Delta: %6.2fms, Call Delta: %6.2fms, Real FPS: %6.2f (%.2f) WxH: %s",
-                     self.frame_index, self.last_time, self.frame_time, wait_time_delta,
-                     self.frame_delta, call_msec_delta, call_fps, call_avg_fps, frame_dims)
+            # reuse the same output buffer across frames, allocated by the first resize (or if dimensions changed)
+            frame = cv.resize(frame, frame_dims, dst=self.video_resized, interpolation=self.video_interpolation)
+            self.video_resized = frame
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Show Frame: %8s, Last: %8.2f, Time: %8.2f, "
+                         "Target Delta: %6.2fms, Call Delta: %6.2fms, Real FPS: %6.2f (%.2f) WxH: %s",
+                         self.frame_index, self.last_time, self.frame_time,
+                         self.frame_delta, call_msec_delta, call_fps, call_avg_fps, frame_dims)
         self.display_frame_info(frame, call_fps, call_avg_fps)
 
-        # note: 'self.frame' is important as without instance reference, it gets garbage collected and is not displayed
         self.video_frame = frame  # in case of snapshot
-        self.frame = PIL.ImageTk.PhotoImage(image=PIL.Image.fromarray(cv.cvtColor(frame, cv.COLOR_RGB2BGR)))
-        self.video_viewer.create_image(0, 0, image=self.frame, anchor=tk.NW)
+        self.display_image(frame)
         self.video_slider.set(self.frame_index)
         self.update_metadata()
 
-        wait_time_delta = 1  # WARNING: just go as fast as possible... tkinter image convert is the limiting factor
-        self.window.after(math.floor(wait_time_delta), self.update_video)
+        # schedule the next frame at its expected playback time rather than as fast as possible
+        # this leaves the event loop available to process pending UI events (slider, buttons, keys) in the meantime
+        next_msec = self.play_clock + self.frame_time + self.frame_delta * self.frame_skip_factor
+        wait_time_delta = max(next_msec - time.perf_counter() * 1000., 1)
+        self.play_job = self.window.after(math.floor(wait_time_delta), self.update_video)
         self.video_viewer.update_idletasks()
 
+    def display_image(self, frame):
+        """
+        Displays the BGR frame by pasting it into the persistent image of the viewer canvas.
+
+        Image is only recreated if the frame dimensions do not match it anymore.
+
+        Pasting blits the image memory directly into the Tk photo image block, which avoids the encoding and parsing of
+        raw PPM data by Tk (see ``tools/tkinter_test.py`` to compare the display methods).
+        """
+        # let PIL unpack the BGR buffer directly to avoid a separate full-frame channel swap pass
+        height, width = frame.shape[:2]
+        image = PIL.Image.frombuffer("RGB", (width, height), frame.data, "raw", "BGR", frame.strides[0], 1)
+        if (self.frame.width(), self.frame.height()) != (width, height):
+            # note: 'self.frame' is important as without instance reference, it gets garbage collected
+            self.frame = PIL.ImageTk.PhotoImage(image)
+            self.video_viewer.itemconfigure(self.video_viewer_image, image=self.frame)
+        else:
+            self.frame.paste(image)
+
     def seek_frame(self, frame_index):
         """
         Moves the video to the given frame index (if not the next one).
@@ -727,6 +926,7 @@ class VideoResultPlayerApp(object):
         if frame_index not in [self.frame_index, self.frame_index - 1]:
             LOGGER.debug("Seek frame: %8s (fetching)", frame_index)
             self.frame_time = self.video.seek(frame_index)
+            self.play_clock = None  # resync playback time from the new position
             self.update_metadata(seek=True)  # enforce fresh update since everything changed drastically
 
         # update slider position
@@ -745,8 +945,18 @@ class VideoResultPlayerApp(object):
         frame_name = "{}_{}_{:.2f}.jpg".format(name_clean, self.frame_index, self.frame_time)
         os.makedirs(self.frame_output, exist_ok=True)
         frame_path = os.path.join(self.frame_output, frame_name)
-        cv.imwrite(frame_path, self.video_frame)
-        LOGGER.info("Saved frame snapshot: [%s]", frame_path)
+        # encode and write the image in the background to avoid freezing the interface
+        # frame buffer is reused for following frames, so it must be copied for the writer
+        if self.snapshot_writer is None:
+            self.snapshot_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="Snapshot")
+        self.snapshot_writer.submit(self.save_snapshot, frame_path, self.video_frame.copy())
+
+    @staticmethod
+    def save_snapshot(frame_path, frame):
+        if cv.imwrite(frame_path, frame):
+            LOGGER.info("Saved frame snapshot: [%s]", frame_path)
+        else:
+            LOGGER.error("Failed saving frame snapshot: [%s]", frame_path)
 
     def generate_srt(self, output):
         dir_path, srt_ext = os.path.splitext(output)
@@ -770,7 +980,7 @@ class VideoResultPlayerApp(object):
 
     def setup_colors(self):
         """
-        Generate list of colors for bounding boxes display.
+        Generate list of colors and drawing functions for bounding boxes display.
         """
         # start with most distinct color variations using 0/255 RGB values
         self.display_colors = set(itertools.product([0, 255], repeat=3))
@@ -781,6 +991,11 @@ class VideoResultPlayerApp(object):
         self.display_colors.remove((255, 255, 255))
         # total 25 colors, more than enough for most use cases
         self.display_colors = list(self.display_colors) + list(half_colors)
+        # bounding box styles are fixed, only dashed or solid box variations are needed
+        self.display_drawer_solid = make_bbox_drawer(box_thickness=1, box_dash_gap=None, box_contour=False,
+                                                     font_thickness=1, font_scale=0.5, font_contour=False)
+        self.display_drawer_dashed = make_bbox_drawer(box_thickness=1, box_dash_gap=5, box_contour=False,
+                                                      font_thickness=1, font_scale=0.5, font_contour=False)
 
     def setup_metadata(self, video_description, video_inferences, text_annotations, text_inferences,
                        text_auto, merged_metadata_input, merged_metadata_output, mapping_file, use_references):
@@ -877,6 +1092,7 @@ class VideoResultPlayerApp(object):
 
         """
         self.mapping_label = read_metafile(path)
+        self.mapping_cache = {}
         if self.mapping_label:
             LOGGER.info("\n  ".join(["Will use label mapping:"] +
                                     ["{}: {}".format(k, v) for k, v in self.mapping_label.items()]))
@@ -896,11 +1112,16 @@ class VideoResultPlayerApp(object):
         mapped = self.mapping_label.get(label)
         if mapped:
             return mapped
-        for search, replace in self.mapping_regex.items():
-            mapped = re.sub(search, replace, label)
-            if mapped != label:
-                return mapped
-        return label
+        # labels are repeated across a lot of entries, resolve the regex substitutions only once for each of them
+        mapped = self.mapping_cache.get(label)
+        if mapped is None:
+            mapped = label
+            for search, replace in self.mapping_regex.items():
+                mapped = search.sub(replace, label)
+                if mapped != label:
+                    break
+            self.mapping_cache[label] = mapped
+        return mapped
 
     def merge_metadata(self,
                        video_description_full_metadata, video_inference_full_metadata,
@@ -998,25 +1219,29 @@ class VideoResultPlayerApp(object):
         else:
             video_inference_time_metadata = []
 
-        def next_entry(meta_list, meta_index):
+        def entry_times(meta_list):
+            """
+            Rounds the start/end times of all metadata entries once rather than each time they are compared.
+            """
+            meta_starts = [round(meta_entry[self.ts_key], self.precision) for meta_entry in meta_list]
+            meta_ends = [round(meta_entry[self.te_key], self.precision) for meta_entry in meta_list]
+            return meta_starts, meta_ends
+
+        def next_entry(meta_list, meta_times, meta_index):
             """
             Finds the active metadata entry for any given metadata-type against current index and start/end times.
             """
             if meta_index is None:
                 return None, None, None, None
-            meta_entry = meta_list[meta_index]
-            meta_end = round(meta_entry[self.te_key], self.precision)
+            meta_starts, meta_ends = meta_times
             # move to next meta index if end time of previous one was reached
-            if last_time >= meta_end:
+            if last_time >= meta_ends[meta_index]:
                 meta_index += 1
                 # if passed last item, no more metadata for this portion against other metadata types
                 if meta_index >= len(meta_list):
                     # return no end time to ignore that value in compare with other metadata types
                     return None, None, None, None
-                meta_entry = meta_list[meta_index]
-                meta_end = round(meta_entry[self.te_key], self.precision)
-            meta_start = round(meta_entry[self.ts_key], self.precision)
-            return meta_entry, meta_index, meta_start, meta_end
+            return meta_list[meta_index], meta_index, meta_starts[meta_index], meta_ends[meta_index]
 
         first_time = None
         last_time = 0
@@ -1024,32 +1249,38 @@ class VideoResultPlayerApp(object):
         ta_total = len(text_annotation_time_metadata)
         ti_total = len(text_inference_time_metadata)
         vi_totals = [len(vi_meta) for vi_meta in video_inference_time_metadata]
+        vd_times = entry_times(video_description_time_metadata)
+        ta_times = entry_times(text_annotation_time_metadata)
+        ti_times = entry_times(text_inference_time_metadata)
+        vi_times = [entry_times(vi_meta) for vi_meta in video_inference_time_metadata]
         while True:
             new_entry = {self.ts_key: None, self.te_key: None,
                          self.vd_key: None, self.ta_key: None, self.ti_key: None, self.vi_key: None}
 
             # find next entry for each metadata type against last time and current indices
-            vd_entry, vd_index, vd_start, vd_end = next_entry(video_description_time_metadata, vd_index)
-            ta_entry, ta_index, ta_start, ta_end = next_entry(text_annotation_time_metadata, ta_index)
-            ti_entry, ti_index, ti_start, ti_end = next_entry(text_inference_time_metadata, ti_index)
+            vd_entry, vd_index, vd_start, vd_end = next_entry(video_description_time_metadata, vd_times, vd_index)
+            ta_entry, ta_index, ta_start, ta_end = next_entry(text_annotation_time_metadata, ta_times, ta_index)
+            ti_entry, ti_index, ti_start, ti_end = next_entry(text_inference_time_metadata, ti_times, ti_index)
             vi_start_multi = []
             vi_end_multi = []
             vi_entries = []
             for i, vi_index in enumerate(vi_indices):
                 if not new_entry[self.vi_key]:
                     new_entry[self.vi_key] = []
-                vi_entry, vi_index, vi_start, vi_end = next_entry(video_inference_time_metadata[i], vi_index)
+                vi_entry, vi_index, vi_start, vi_end = next_entry(video_inference_time_metadata[i], vi_times[i],
+                                                                  vi_index)
                 vi_indices[i] = vi_index
                 vi_start_multi.append(vi_start)
                 vi_end_multi.append(vi_end)
                 vi_entries.append(vi_entry)
 
-            vd_txt = "(done)" if vd_index is None else "({}/{})".format(vd_index + 1, vd_total)
-            ta_txt = "(done)" if ta_index is None else "({}/{})".format(ta_index + 1, ta_total)
-            ti_txt = "(done)" if ti_index is None else "({}/{})".format(ti_index + 1, ti_total)
-            vi_txt = ", ".join(["(done)" if vi_i is None else "({}/{})".format(vi_i + 1, vi_t)
-                                for vi_i, vi_t in zip(vi_indices, vi_totals)])
-            LOGGER.debug("Merged: VI [%s] TA [%s] TI [%s] VI [%s]", vd_txt, ta_txt, ti_txt, vi_txt)
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                vd_txt = "(done)" if vd_index is None else "({}/{})".format(vd_index + 1, vd_total)
+                ta_txt = "(done)" if ta_index is None else "({}/{})".format(ta_index + 1, ta_total)
+                ti_txt = "(done)" if ti_index is None else "({}/{})".format(ti_index + 1, ti_total)
+                vi_txt = ", ".join(["(done)" if vi_i is None else "({}/{})".format(vi_i + 1, vi_t)
+                                    for vi_i, vi_t in zip(vi_indices, vi_totals)])
+                LOGGER.debug("Merged: VI [%s] TA [%s] TI [%s] VI [%s]", vd_txt, ta_txt, ti_txt, vi_txt)
 
             # check ending condition
             vd_done = vd_index is None or vd_index == vd_total
@@ -1063,13 +1294,14 @@ class VideoResultPlayerApp(object):
             # first time could be different than zero if all items started with an offset
             if first_time is None:
                 start_times = [vd_start, ta_start, ti_start] + vi_start_multi
-                first_time = round(min(filter(lambda start: start is not None, start_times)), self.precision)
+                # start times are already rounded, so is their minimum
+                first_time = min(start for start in start_times if start is not None)
                 last_time = first_time
 
             # find next loop start time with first end time of current iteration to find next cut point
             # ignore exhausted end times if last item from its metadata list was passed
             end_times = [vd_end, ta_end, ti_end] + vi_end_multi
-            end_time = round(min(filter(lambda end: end is not None, end_times)), self.precision)
+            end_time = min(end for end in end_times if end is not None)
 
             # remove entries until the first entry of corresponding type is reached
             vd_entry = vd_entry if vd_entry and end_time >= vd_start else None
@@ -1370,9 +1602,11 @@ class VideoResultPlayerApp(object):
                 for i, s in enumerate(sentences):
                     if i >= len(annotation_list):
                         break
-                    if not any([a["lemme"].replace("_", " ") in s for a in annotation_list[i]]):
+                    if not any(a["lemme"].replace("_", " ") in s for a in annotation_list[i]):
                         break
-                annotation_list.insert(i, [])
+                # since an inserted empty annotation never matches, following ones would be found at the same index
+                # insert all missing ones at once instead of searching it again for each of them
+                annotation_list[i:i] = [[] for _ in range(len(sentences) - len(annotation_list))]
             else:
                 # merge over abundant annotations
                 annotation_list[0].extend(annotation_list.pop(1))
@@ -1469,8 +1703,9 @@ def make_parser():
                             help="Queue size to attempt preloading frames "
                                  "(warning: impacts FPS) (default: %(default)s).")
     video_opts.add_argument("--frame-drop-factor", "--drop", type=int, default=VideoResultPlayerApp.frame_drop_factor,
-                            help="Factor by which the delayed video frames should be dropped if exceeding target FPS. "
-                                 "Avoids long sporadic lags (default: %(default)s).")
+                            help="Factor of the target frame delay by which the displayed video can lag behind its "
+                                 "expected time before frames are dropped to catch up, with at most that many "
+                                 "consecutive frames dropped. Avoids long sporadic lags (default: %(default)s).")
     video_opts.add_argument("--frame-skip-factor", "--skip", type=int, default=VideoResultPlayerApp.frame_skip_factor,
                             help="Factor by which to voluntarily skip video frames to make them pass faster. "
                                  "If playback feels like it still has too much lag, increasing this value can help by "
@@ -8,6 +8,7 @@ import sys
 import time
 
 import cv2 as cv
+import numpy as np
 import tkinter as tk
 from PIL import Image, ImageTk
 
@@ -26,61 +27,108 @@ LOGGER.addHandler(_handler)
 def make_parser():
     ap = argparse.ArgumentParser(prog=__NAME__, description=__doc__, add_help=True)
     ap.add_argument("video_file", help="Video file to view.")
+    ap.add_argument("--method", choices=["paste", "ppm", "rgba"], default="paste",
+                    help="Conversion method of frames to Tk images. Either BGR frames pasted by PIL into a single "
+                         "reused Tk image, raw PPM data parsed by Tk, or RGBA frames converted by PIL "
+                         "(default: %(default)s).")
+    ap.add_argument("--opencl", action="store_true",
+                    help="Convert frame colors on the OpenCL device (transparent API) when available.")
     ap.add_argument("--quiet", "-q", action="store_true", help="Do not output anything else than error.")
     ap.add_argument("--debug", "-d", action="store_true", help="Enable extra debug logging.")
     return ap
 
 
 class BasicVideoApp(object):
-    def __init__(self, video_file):
+    def __init__(self, video_file, method="paste", opencl=False):
+        self.method = method
+        self.opencl = opencl and cv.ocl.haveOpenCL()
+        if opencl and not self.opencl:
+            LOGGER.warning("OpenCL is not available, using CPU color conversion.")
         self.video = VideoCaptureThread(video_file)
         self.video.start()
         self.root = tk.Tk()
         self.frame = None
         self.image = None
+        self.header = None
+        self.header_dims = None
         self.panel = None
+        self.log_interval = 30  # frames
         self.loop()
 
+    def convert_frame(self):
+        if self.method == "paste":
+            # let PIL unpack the BGR buffer directly to avoid a separate full-frame channel swap pass
+            height, width = self.frame.shape[:2]
+            return Image.frombuffer("RGB", (width, height), self.frame.data, "raw", "BGR", self.frame.strides[0], 1)
+        if self.method == "rgba":
+            # produce RGBA directly in a single pass since ImageTk would otherwise convert RGB to RGBA internally
+            if self.opencl:
+                rgba = cv.cvtColor(cv.UMat(self.frame), cv.COLOR_BGR2RGBA).get()
+            else:
+                rgba = cv.cvtColor(self.frame, cv.COLOR_BGR2RGBA)
+            return Image.fromarray(rgba, mode="RGBA")
+        # build raw PPM data directly from the frame to let Tk parse it without any PIL conversion
+        height, width = self.frame.shape[:2]
+        if self.header is None or self.header_dims != (width, height):
+            self.header = "P6\n{} {}\n255\n".format(width, height).encode()
+            self.header_dims = (width, height)
+        if self.opencl:
+            rgb = cv.cvtColor(cv.UMat(self.frame), cv.COLOR_BGR2RGB).get()
+        else:
+            rgb = self.frame[:, :, ::-1]  # BGR -> RGB
+        return self.header + rgb.tobytes()
+
+    def make_image(self, data):
+        if self.method == "paste":
+            # reuse the same Tk image buffer across frames, only recreate it if the resolution changes
+            if self.image is None or (self.image.width(), self.image.height()) != data.size:
+                return ImageTk.PhotoImage(data)
+            self.image.paste(data)
+            return self.image
+        if self.method == "rgba":
+            return ImageTk.PhotoImage(data)
+        return tk.PhotoImage(data=data, format="PPM")
+
+    def display(self):
+        # if the panel is not None, we need to initialize it
+        if self.panel is None:
+            self.panel = tk.Label(image=self.image)
+            self.panel.image = self.image
+            self.panel.pack(side="left", padx=10, pady=10)
+
+        # otherwise, simply update the panel if the image changed
+        elif self.panel.image is not self.image:
+            self.panel.configure(image=self.image)
+            self.panel.image = self.image
+
     def loop(self):
+        # ring buffer of timings (convert, image, display, total) in seconds, only sampled when debugging
+        timings = np.zeros((256, 4), dtype=np.float64)
+        counter = 0
         last = time.perf_counter()
-        cumul0 = cumul1 = cumul2 = cumul3 = counter = 0
         while True:
             grabbed, self.frame, _, _ = self.video.read()
             if not grabbed:
                 continue
-            t0 = time.perf_counter()
-            self.image = cv.cvtColor(self.frame, cv.COLOR_BGR2RGB)
+            if not LOGGER.isEnabledFor(logging.DEBUG):
+                self.image = self.make_image(self.convert_frame())
+                self.display()
+                continue
+
             t1 = time.perf_counter()
-            self.image = Image.fromarray(self.image)
+            data = self.convert_frame()
             t2 = time.perf_counter()
-            self.image = ImageTk.PhotoImage(self.image)
+            self.image = self.make_image(data)
             t3 = time.perf_counter()
-
-            # if the panel is not None, we need to initialize it
-            if self.panel is None:
-                self.panel = tk.Label(image=self.image)
-                self.panel.image = self.image
-                self.panel.pack(side="left", padx=10, pady=10)
-
-            # otherwise, simply update the panel
-            else:
-                self.panel.configure(image=self.image)
-                self.panel.image = self.image
+            self.display()
             t4 = time.perf_counter()
-            delta0 = 1000. * (t1 - t0)
-            cumul0 += delta0
-            delta1 = 1000. * (t2 - t1)
-            cumul1 += delta1
-            delta2 = 1000. * (t3 - t2)
-            cumul2 += delta2
-            delta3 = 1000. * (t4 - t3)
-            cumul3 += delta3
+            timings[counter % len(timings)] = (t2 - t1, t3 - t2, t4 - t3, t4 - last)
+            last = t4
             counter += 1
-            LOGGER.debug("FPS: %6.2f | %6.2fms (%6.2fms), %6.2fms (%6.2fms), %6.2fms (%6.2fms), %6.2fms (%6.2fms)",
-                         1. / (time.perf_counter() - last),
-                         delta0, cumul1 / counter, delta0, cumul1 / counter,
-                         delta2, cumul2 / counter, delta3, cumul3 / counter)
-            last = time.perf_counter()
+            if not counter % self.log_interval:
+                mean = timings[:min(counter, len(timings))].mean(axis=0) * 1000.
+                LOGGER.debug("FPS: %6.2f | Convert: %6.2fms, Image: %6.2fms, Display: %6.2fms",
+                             1000. / mean[3], mean[0], mean[1], mean[2])
 
 
 def main():